@@ -3,8 +3,13 @@ Business logic for Retirement Savings API.
 Handles all financial calculations.
 """
 import math
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Optional, Tuple
+from functools import lru_cache
+from itertools import accumulate
+from operator import itemgetter
+from typing import Iterator, List, Optional, Tuple
 
 NPS_RATE = 0.0711
 INDEX_RATE = 0.1449
@@ -13,15 +18,23 @@ NPS_MAX_DEDUCTION_PCT = 0.10
 RETIREMENT_AGE = 60
 MIN_YEARS = 5
 ROUND_BASE = 100
+_ROUND_BASE_F = float(ROUND_BASE)  # keeps ceilings float for int amounts
 
 DATETIME_FORMATS = [
     "%Y-%m-%d %H:%M:%S",
     "%Y-%m-%d %H:%M",
 ]
 
+@lru_cache(maxsize=100_000)
 def parse_dt(dt_str: str) -> datetime:
-    """Parse a datetime string flexibly."""
+    """Parse a datetime string flexibly (memoized per unique string)."""
     cleaned = dt_str.strip()
+    # Canonical "YYYY-MM-DD HH:mm:ss" goes through the C fromisoformat parser, not strptime
+    if len(cleaned) == 19 and cleaned[4:17:3] == "-- ::":
+        try:
+            return datetime.fromisoformat(cleaned)
+        except ValueError:
+            pass  # fall through so strptime reports the same error as before
     for fmt in DATETIME_FORMATS:
         try:
             return datetime.strptime(cleaned, fmt)
@@ -29,82 +42,177 @@ def parse_dt(dt_str: str) -> datetime:
             continue
     raise ValueError(f"Cannot parse datetime: '{dt_str}'. Expected format: YYYY-MM-DD HH:mm:ss")
 
-def is_in_range(dt: datetime, start: datetime, end: datetime) -> bool:
-    return start <= dt <= end
+
+# Columnar Transactions
+@dataclass
+class Transactions:
+    """
+    Processed transactions as index-aligned columns (struct-of-arrays).
+    Built by process_transactions; serialized back to dicts only at the HTTP boundary.
+    """
+    dates: List[str]
+    amounts: List[float]
+    dts: List[datetime]
+    ceilings: List[float]
+    remanents: List[float]
+
+    def __len__(self) -> int:
+        return len(self.dates)
 
 
 def compute_ceiling(amount: float) -> float:
     if amount <= 0:
         return 0.0
-    remainder = amount % ROUND_BASE
-    if remainder == 0:
-        return float(amount)
-    return float(amount + (ROUND_BASE - remainder))
+    return -(-amount // ROUND_BASE) * _ROUND_BASE_F
 
 def compute_remanent(amount: float, ceiling: float) -> float:
     return round(ceiling - amount, 10)
 
+def round_up_amounts(amounts: List[float]) -> Tuple[List[float], List[float]]:
+    """
+    Column-wise ceiling/remanent for a batch of amounts.
+    Returns (ceilings, remanents), index-aligned with amounts.
+    Same arithmetic as compute_ceiling/compute_remanent, inlined to skip a call per row.
+    """
+    ceilings = [-(-amount // ROUND_BASE) * _ROUND_BASE_F if amount > 0 else 0.0 for amount in amounts]
+    remanents = [round(ceiling - amount, 10) for amount, ceiling in zip(amounts, ceilings)]
+    return ceilings, remanents
 
-# q Period (Fixed Override)
-def apply_q_periods(remanent: float, tx_dt: datetime, q_periods: list) -> float:
-    matching = [
-        (i, q) for i, q in enumerate(q_periods)
-        if is_in_range(tx_dt, parse_dt(q["start"]), parse_dt(q["end"]))
+
+# Period Pre-parsing
+def parse_periods(periods: list, value_key: Optional[str] = None) -> List[tuple]:
+    """
+    Parse period boundaries once per request into (start_dt, end_dt, payload) tuples.
+    payload is float(period[value_key]) when a key is given, else the period dict itself.
+    """
+    return [
+        (
+            parse_dt(period["start"]),
+            parse_dt(period["end"]),
+            float(period[value_key]) if value_key else period,
+        )
+        for period in periods
     ]
-    if not matching:
-        return remanent
 
-    best_idx, best_q = max(matching, key=lambda t: (parse_dt(t[1]["start"]), -t[0]))
-    return float(best_q["fixed"])
+
+# q Period (Fixed Override)
+def order_q_periods(q_parsed: list) -> list:
+    """
+    Parsed q periods latest start first; the sort is stable, so equal starts keep list order.
+    The first match in this order is the winning q (see apply_q_periods_parsed).
+    """
+    return sorted(q_parsed, key=itemgetter(0), reverse=True)
+
+def apply_q_periods_parsed(remanent: float, tx_dt: datetime, q_ordered: list) -> float:
+    """
+    Latest-start matching q wins; on equal starts the first in the list is kept.
+    q_ordered comes from order_q_periods, so the scan stops at the first match.
+    """
+    for start, end, fixed in q_ordered:
+        if start <= tx_dt <= end:
+            return fixed
+    return remanent
+
+def apply_q_periods(remanent: float, tx_dt: datetime, q_periods: list) -> float:
+    return apply_q_periods_parsed(remanent, tx_dt, order_q_periods(parse_periods(q_periods, "fixed")))
 
 
 # p Period (Extra Addition)
-def apply_p_periods(remanent: float, tx_dt: datetime, p_periods: list) -> float:
+def apply_p_periods_parsed(remanent: float, tx_dt: datetime, p_parsed: list) -> float:
     total_extra = sum(
-        p["extra"]
-        for p in p_periods
-        if is_in_range(tx_dt, parse_dt(p["start"]), parse_dt(p["end"]))
+        extra
+        for start, end, extra in p_parsed
+        if start <= tx_dt <= end
     )
     return remanent + total_extra
 
+def apply_p_periods(remanent: float, tx_dt: datetime, p_periods: list) -> float:
+    return apply_p_periods_parsed(remanent, tx_dt, parse_periods(p_periods, "extra"))
+
 
 # k Period Grouping
-def group_by_k(transactions: list, k_periods: list) -> List[dict]:
+def merge_periods(parsed: list) -> Tuple[List[datetime], List[datetime]]:
     """
-    For each k period, sum the remanents of transactions within that range.
+    Union of parsed (start, end, _) periods as disjoint, sorted (starts, ends) columns,
+    so membership in any period is a single bisect (see in_any_period).
+    """
+    starts, ends = [], []
+    for start, end in sorted((start, end) for start, end, _ in parsed):
+        if start > end:
+            continue  # empty period matches nothing
+        if ends and start <= ends[-1]:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+def in_any_period(dt: datetime, starts: List[datetime], ends: List[datetime]) -> bool:
+    i = bisect_right(starts, dt) - 1
+    return i >= 0 and dt <= ends[i]
+
+def group_by_k(transactions: Transactions, k_parsed: list) -> List[dict]:
+    """
+    For each k period (from parse_periods), sum the remanents of transactions within that range.
     A transaction can belong to multiple k periods.
+    Transactions are sorted by date once into a running total of remanent cents,
+    so each k period is two bisects and one exact integer subtraction.
+    A period whose start is after its end matches nothing and sums to 0.
+    Non-finite remanents (NaN/inf) have no cents value; those requests fall back to float sums.
     """
+    order = sorted(range(len(transactions)), key=transactions.dts.__getitem__)
+    dts = [transactions.dts[i] for i in order]
+    remanents = [transactions.remanents[i] for i in order]
+    if all(math.isfinite(remanent * 100) for remanent in remanents):
+        cents = list(accumulate((round(remanent * 100) for remanent in remanents), initial=0))
+    else:
+        cents = None
+
     results = []
-    for k in k_periods:
-        k_start = parse_dt(k["start"])
-        k_end = parse_dt(k["end"])
-        total = sum(
-            tx["_remanent"]
-            for tx in transactions
-            if is_in_range(parse_dt(tx["date"]), k_start, k_end)
-        )
+    for k_start, k_end, k in k_parsed:
+        lo = bisect_left(dts, k_start)
+        hi = bisect_right(dts, k_end)
+        if hi <= lo:
+            amount = 0.0
+        elif cents is None:
+            amount = round(sum(remanents[lo:hi]), 2)
+        else:
+            amount = (cents[hi] - cents[lo]) / 100
         results.append({
             "start": k["start"],
             "end": k["end"],
-            "amount": round(total, 2),
+            "amount": amount,
         })
     return results
 
 
 # Tax Calculation
+# (lower, upper, rate): income within (lower, upper] is taxed at rate
+TAX_SLABS = (
+    (700_000, 1_000_000, 0.10),
+    (1_000_000, 1_200_000, 0.15),
+    (1_200_000, 1_500_000, 0.20),
+    (1_500_000, math.inf, 0.30),
+)
+
+def _tax_brackets(slabs: tuple) -> tuple:
+    """(lower, rate, tax owed on everything up to lower) per slab, highest slab first."""
+    brackets, owed_below = [], 0.0
+    for lower, upper, rate in slabs:
+        brackets.append((lower, rate, owed_below))
+        owed_below += (upper - lower) * rate
+    return tuple(reversed(brackets))
+
+# Cumulative tax of the full lower slabs is folded in once at import
+_TAX_BRACKETS = _tax_brackets(TAX_SLABS)
+
+@lru_cache(maxsize=8192)
 def calculate_tax(income: float) -> float:
-    """Simplified Indian tax slab calculation (pre-tax income)."""
-    if income <= 700_000:
-        return 0.0
-    elif income <= 1_000_000:
-        return (income - 700_000) * 0.10
-    elif income <= 1_200_000:
-        return 300_000 * 0.10 + (income - 1_000_000) * 0.15
-    elif income <= 1_500_000:
-        return 300_000 * 0.10 + 200_000 * 0.15 + (income - 1_200_000) * 0.20
-    else:
-        return 300_000 * 0.10 + 200_000 * 0.15 + 300_000 * 0.20 + (income - 1_500_000) * 0.30
-
+    """Simplified Indian tax slab calculation (pre-tax income). Memoized per income."""
+    for lower, rate, owed_below in _TAX_BRACKETS:
+        if income > lower:
+            return owed_below + (income - lower) * rate
+    return 0.0
 
 def calculate_tax_benefit(invested: float, annual_income: float) -> float:
     """NPS tax benefit based on invested amount and annual income."""
@@ -125,78 +233,106 @@ def inflation_adjust(amount: float, inflation_rate_pct: float, years: int) -> fl
     """Deflate future value to today's purchasing power."""
     return amount / math.pow(1 + inflation_rate_pct / 100, years)
 
+def real_growth_factor(rate: float, inflation_rate_pct: float, years: int) -> float:
+    """(1 + r)^t / (1 + inflation%)^t as a single power: real value = principal * factor."""
+    return math.pow((1 + rate) / (1 + inflation_rate_pct / 100), years)
+
+def calculate_nps_returns(amounts: List[float], age: int, wage: float, inflation: float) -> List[Tuple[float, float]]:
+    """
+    Batch form of calculate_nps_return: [(profit, tax_benefit), ...] per amount.
+    The growth factor, base tax and deduction cap are request-invariant, so they
+    are computed once instead of per amount.
+    """
+    growth = real_growth_factor(NPS_RATE, inflation, compute_years(age))
+    annual_income = wage * 12
+    base_tax = calculate_tax(annual_income)
+    deduction_cap = min(NPS_MAX_DEDUCTION_PCT * annual_income, NPS_MAX_DEDUCTION)
+    return [
+        (
+            round(amount * growth - amount, 2),
+            round(base_tax - calculate_tax(annual_income - min(amount, deduction_cap)), 2),
+        )
+        for amount in amounts
+    ]
+
 def calculate_nps_return(amount: float, age: int, wage: float, inflation: float) -> Tuple[float, float]:
     """
     Returns (profit, tax_benefit) for NPS investment.
     profit = real_value - principal  (inflation-adjusted net gain)
     """
-    years = compute_years(age)
-    future_value = compound_value(amount, NPS_RATE, years)
-    real_value = inflation_adjust(future_value, inflation, years)
-    profit = round(real_value - amount, 2)
-    annual_income = wage * 12
-    tax_benefit = round(calculate_tax_benefit(amount, annual_income), 2)
-    return profit, tax_benefit
+    return calculate_nps_returns([amount], age, wage, inflation)[0]
+
+def calculate_index_returns(amounts: List[float], age: int, inflation: float) -> List[float]:
+    """Batch form of calculate_index_return; the growth factor is computed once."""
+    growth = real_growth_factor(INDEX_RATE, inflation, compute_years(age))
+    return [round(amount * growth, 2) for amount in amounts]
 
 def calculate_index_return(amount: float, age: int, inflation: float) -> float:
     """
     Returns total real return (inflation-adjusted final value) for Index Fund.
     """
-    years = compute_years(age)
-    future_value = compound_value(amount, INDEX_RATE, years)
-    real_value = inflation_adjust(future_value, inflation, years)
-    return round(real_value, 2)
+    return calculate_index_returns([amount], age, inflation)[0]
 
 
 #  Transaction Validators
-def validate_transactions(transactions: list) -> Tuple[list, list]:
+def iter_validated(transactions: list) -> Iterator[Tuple[dict, Optional[str]]]:
     """
-    Returns (valid_list, invalid_list).
-    Checks for: negative amounts, duplicate dates.
+    Yield (tx, message) per transaction in input order; message is None when valid.
+    Checks for: negative amounts, duplicate dates (first failing check wins).
     """
-    valid, invalid = [], []
-    seen_dates = {}
-
+    seen_dates = set()
+    mark_seen = seen_dates.add
     for tx in transactions:
-        errors = []
-        if tx.get("amount", 0) < 0:
-            errors.append("Negative amounts are not allowed")
-
         date_key = tx.get("date", "")
-        if date_key in seen_dates:
-            errors.append("Duplicate transaction")
-
-        if errors:
-            invalid.append({**tx, "message": errors[0]})
+        if tx.get("amount", 0) < 0:
+            yield tx, "Negative amounts are not allowed"
+        elif date_key in seen_dates:
+            yield tx, "Duplicate transaction"
         else:
-            seen_dates[date_key] = True
-            valid.append(tx)
+            mark_seen(date_key)
+            yield tx, None
 
+def validate_transactions(transactions: list) -> Tuple[list, list]:
+    """
+    Returns (valid_list, invalid_list); invalid entries are (tx, message) tuples.
+    """
+    valid, invalid = [], []
+    for tx, message in iter_validated(transactions):
+        if message is None:
+            valid.append(tx)
+        else:
+            invalid.append((tx, message))
     return valid, invalid
 
 
 
-def process_transactions(transactions: list, q_periods: list, p_periods: list) -> list:
+def compute_remanents(
+    amounts: List[float], tx_dts: List[datetime], q_parsed: list, p_parsed: list,
+) -> Tuple[List[float], List[float]]:
     """
-    Apply all period rules to a list of raw expense dicts.
-    Adds _ceiling and _remanent (private fields for internal use).
+    Numeric core of process_transactions over index-aligned columns.
+    Returns (ceilings, remanents) with the q override then p addition applied;
+    remanents are rounded to 2 decimals. q periods are ordered once per call,
+    not once per transaction.
     """
-    processed = []
-    for tx in transactions:
-        amount = tx["amount"]
-        ceiling = compute_ceiling(amount)
-        remanent = compute_remanent(amount, ceiling)
-
-        # Step 2: q override
-        tx_dt = parse_dt(tx["date"])
-        remanent = apply_q_periods(remanent, tx_dt, q_periods)
+    ceilings, remanents = round_up_amounts(amounts)
+    q_ordered = order_q_periods(q_parsed)
+    apply_q, apply_p = apply_q_periods_parsed, apply_p_periods_parsed  # local lookups in the hot loop
+    for i, tx_dt in enumerate(tx_dts):
+        remanent = apply_q(remanents[i], tx_dt, q_ordered)  # Step 2: q override
+        remanent = apply_p(remanent, tx_dt, p_parsed)       # Step 3: p addition
+        remanents[i] = round(remanent, 2)
+    return ceilings, remanents
 
-        # Step 3: p addition
-        remanent = apply_p_periods(remanent, tx_dt, p_periods)
 
-        processed.append({
-            **tx,
-            "_ceiling": ceiling,
-            "_remanent": round(remanent, 2),
-        })
-    return processed
+def process_transactions(transactions: list, q_parsed: list, p_parsed: list) -> Transactions:
+    """
+    Apply all period rules to a list of raw expense dicts.
+    q_parsed / p_parsed come from parse_periods(..., "fixed") / parse_periods(..., "extra").
+    Returns the result as columns (see Transactions).
+    """
+    dates = [tx["date"] for tx in transactions]
+    amounts = [tx["amount"] for tx in transactions]
+    dts = list(map(parse_dt, dates))
+    ceilings, remanents = compute_remanents(amounts, dts, q_parsed, p_parsed)
+    return Transactions(dates, amounts, dts, ceilings, remanents)
@@ -0,0 +1,13 @@
+"""
+Gunicorn settings for the production container.
+One worker process per core (each with a few threads) so CPU-bound requests
+are not serialized behind a single interpreter's GIL.
+Override with WEB_CONCURRENCY / GUNICORN_THREADS.
+"""
+import multiprocessing
+import os
+
+bind = "0.0.0.0:5477"
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
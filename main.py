@@ -3,8 +3,9 @@ BlackRock Retirement Savings API
 ---------------------------------
 Automated micro-savings system with investment projections.
 Port: 5477
-Framework: Flask
+Framework: Flask (served by gunicorn in production, see gunicorn.conf.py)
 """
+import json
 import os
 import time
 import threading
@@ -12,15 +13,23 @@ import psutil
 from flask import Flask, request, jsonify, abort
 
 from business import (
-    compute_ceiling, compute_remanent, parse_dt,
-    validate_transactions, process_transactions,
-    group_by_k, calculate_nps_return, calculate_index_return,
-    is_in_range,
+    compute_ceiling, compute_remanent, round_up_amounts,
+    parse_periods, merge_periods, in_any_period,
+    iter_validated, validate_transactions, process_transactions,
+    group_by_k, calculate_nps_returns, calculate_index_returns,
 )
 
 # ─── App Setup ─────────────────────────────────────────────────────────────────
 app = Flask(__name__)
+# Responses are built in a fixed field order; skip the per-response key sort,
+# always emit compact separators (no indentation even under debug) and write
+# UTF-8 directly instead of \u-escaping non-ASCII text.
+app.json.sort_keys = False
+app.json.compact = True
+app.json.ensure_ascii = False
 APP_START = time.time()
+# Per worker process: each gunicorn worker imports this module after forking
+PROCESS = psutil.Process(os.getpid())
 
 # ─── Helpers ──────────────────────────────────────────────────────────────────
 
@@ -30,11 +39,24 @@ def require_json():
 
 def get_json_body():
     require_json()
-    data = request.get_json(silent=True)
+    # Decode the raw bytes directly; cache=False avoids keeping a second copy of the body
+    try:
+        data = json.loads(request.get_data(cache=False))
+    except ValueError:
+        data = None
     if data is None:
         abort(400, description="Invalid JSON body")
     return data
 
+def get_periods(body: dict, key: str, value_key: str = None) -> list:
+    """Parse body[key] periods once per request; a malformed period is a 400, not a 500."""
+    try:
+        return parse_periods(body.get(key, []), value_key)
+    except KeyError as exc:
+        abort(400, description=f"Invalid '{key}' period: missing {exc}")
+    except (TypeError, ValueError, AttributeError) as exc:
+        abort(400, description=f"Invalid '{key}' period: {exc}")
+
 
 # ─── Endpoint 1: Transaction Builder ──────────────────────────────────────────
 @app.post("/blackrock/challenge/v1/transactions:parse")
@@ -46,17 +68,17 @@ def parse_transactions():
     Output: [{"date":..., "amount":..., "ceiling":..., "remanent":...}, ...]
     """
     expenses = get_json_body()
-    result = []
-    for exp in expenses:
-        amount = float(exp["amount"])
-        ceiling = compute_ceiling(amount)
-        remanent = round(compute_remanent(amount, ceiling), 2)
-        result.append({
+    amounts = [float(exp["amount"]) for exp in expenses]
+    ceilings, remanents = round_up_amounts(amounts)
+    result = [
+        {
             "date": exp["date"],
             "amount": amount,
             "ceiling": ceiling,
-            "remanent": remanent,
-        })
+            "remanent": round(remanent, 2),
+        }
+        for exp, amount, ceiling, remanent in zip(expenses, amounts, ceilings, remanents)
+    ]
     return jsonify(result), 200
 
 
@@ -70,27 +92,25 @@ def validate():
     Output: {"valid": [...], "invalid": [...]}
     """
     body = get_json_body()
-    raw = body.get("transactions", [])
-    valid_raw, invalid_raw = validate_transactions(raw)
-
-    def enrich(tx):
+    valid_out, invalid_out = [], []
+    ceil_of, remanent_of = compute_ceiling, compute_remanent  # local lookups in the hot loop
+    for tx, message in iter_validated(body.get("transactions", [])):
         amount = float(tx.get("amount", 0))
-        ceiling = float(tx.get("ceiling") or compute_ceiling(amount))
-        remanent = float(tx.get("remanent") or compute_remanent(amount, ceiling))
-        return {
+        ceiling = float(tx.get("ceiling") or ceil_of(amount))
+        remanent = float(tx.get("remanent") or remanent_of(amount, ceiling))
+        out = {
             "date": tx["date"],
             "amount": amount,
             "ceiling": ceiling,
             "remanent": remanent,
         }
+        if message is None:
+            valid_out.append(out)
+        else:
+            out["message"] = message
+            invalid_out.append(out)
 
-    return jsonify({
-        "valid": [enrich(tx) for tx in valid_raw],
-        "invalid": [
-            {**enrich(tx), "message": tx["message"]}
-            for tx in invalid_raw
-        ],
-    }), 200
+    return jsonify({"valid": valid_out, "invalid": invalid_out}), 200
 
 
 # ─── Endpoint 3: Temporal Constraints Filter ──────────────────────────────────
@@ -109,31 +129,32 @@ def filter_transactions():
     """
     body = get_json_body()
     raw = body.get("transactions", [])
-    q_list = body.get("q", [])
-    p_list = body.get("p", [])
-    k_list = body.get("k", [])
+    # Period boundaries are parsed once here, never per transaction
+    q_parsed = get_periods(body, "q", "fixed")
+    p_parsed = get_periods(body, "p", "extra")
+    k_parsed = get_periods(body, "k")
 
     valid_raw, invalid_raw = validate_transactions(raw)
-    processed = process_transactions(valid_raw, q_list, p_list)
-
-    valid_out = []
-    for tx in processed:
-        tx_dt = parse_dt(tx["date"])
-        in_k = any(
-            is_in_range(tx_dt, parse_dt(k["start"]), parse_dt(k["end"]))
-            for k in k_list
+    processed = process_transactions(valid_raw, q_parsed, p_parsed)
+    k_starts, k_ends = merge_periods(k_parsed)
+
+    valid_out = [
+        {
+            "date": date,
+            "amount": float(amount),
+            "ceiling": float(ceiling),
+            "remanent": float(remanent),
+            "inkPeriod": in_any_period(tx_dt, k_starts, k_ends),
+        }
+        for date, amount, tx_dt, ceiling, remanent in zip(
+            processed.dates, processed.amounts, processed.dts,
+            processed.ceilings, processed.remanents,
         )
-        valid_out.append({
-            "date": tx["date"],
-            "amount": float(tx["amount"]),
-            "ceiling": float(tx["_ceiling"]),
-            "remanent": float(tx["_remanent"]),
-            "inkPeriod": in_k,
-        })
+    ]
 
     invalid_out = [
-        {"date": tx["date"], "amount": float(tx.get("amount", 0)), "message": tx["message"]}
-        for tx in invalid_raw
+        {"date": tx["date"], "amount": float(tx.get("amount", 0)), "message": message}
+        for tx, message in invalid_raw
     ]
 
     return jsonify({"valid": valid_out, "invalid": invalid_out}), 200
@@ -145,39 +166,46 @@ def _compute_returns(body: dict, mode: str) -> dict:
     age = int(body["age"])
     wage = float(body["wage"])
     inflation = float(body["inflation"])
-    q_list = body.get("q", [])
-    p_list = body.get("p", [])
-    k_list = body.get("k", [])
+    # Period boundaries are parsed once here, never per transaction
+    q_parsed = get_periods(body, "q", "fixed")
+    p_parsed = get_periods(body, "p", "extra")
+    k_parsed = get_periods(body, "k")
 
     valid_raw, _ = validate_transactions(raw)
-    processed = process_transactions(valid_raw, q_list, p_list)
+    processed = process_transactions(valid_raw, q_parsed, p_parsed)
 
-    total_amount = round(sum(tx["amount"] for tx in processed), 2)
-    total_ceiling = round(sum(tx["_ceiling"] for tx in processed), 2)
+    total_amount = round(sum(processed.amounts), 2)
+    total_ceiling = round(sum(processed.ceilings), 2)
 
-    k_groups = group_by_k(processed, k_list)
+    k_groups = group_by_k(processed, k_parsed)
 
-    savings_by_dates = []
-    for group in k_groups:
-        amount = group["amount"]
-        if mode == "nps":
-            profit, tax_benefit = calculate_nps_return(amount, age, wage, inflation)
-            savings_by_dates.append({
+    amounts = [group["amount"] for group in k_groups]
+    if mode == "nps":
+        savings_by_dates = [
+            {
                 "start": group["start"],
                 "end": group["end"],
                 "amount": amount,
                 "profit": profit,
                 "taxBenefit": tax_benefit,
-            })
-        else:
-            ret = calculate_index_return(amount, age, inflation)
-            savings_by_dates.append({
+            }
+            for group, amount, (profit, tax_benefit) in zip(
+                k_groups, amounts, calculate_nps_returns(amounts, age, wage, inflation)
+            )
+        ]
+    else:
+        savings_by_dates = [
+            {
                 "start": group["start"],
                 "end": group["end"],
                 "amount": amount,
                 "profit": round(ret - amount, 2),
                 "taxBenefit": 0.0,
-            })
+            }
+            for group, amount, ret in zip(
+                k_groups, amounts, calculate_index_returns(amounts, age, inflation)
+            )
+        ]
 
     return {
         "totalTransactionAmount": total_amount,
@@ -205,14 +233,17 @@ def returns_index():
 # ─── Endpoint 5: Performance Report ───────────────────────────────────────────
 @app.get("/blackrock/challenge/v1/performance")
 def performance():
+    """
+    Uptime, RSS and thread count of the process serving this request.
+    Under gunicorn that is one worker, not the whole server; uptime restarts when the worker is recycled.
+    """
     uptime = time.time() - APP_START
     h = int(uptime // 3600)
     m = int((uptime % 3600) // 60)
     s = int(uptime % 60)
     ms = int((uptime % 1) * 1000)
 
-    proc = psutil.Process(os.getpid())
-    mem_mb = proc.memory_info().rss / (1024 * 1024)
+    mem_mb = PROCESS.memory_info().rss / (1024 * 1024)
 
     return jsonify({
         "time": f"{h:02d}:{m:02d}:{s:02d}.{ms:03d}",
@@ -242,5 +273,6 @@ def server_error(e):
 
 
 # ─── Entry Point ───────────────────────────────────────────────────────────────
+# Local development only; production runs `gunicorn main:app` (see gunicorn.conf.py).
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5477, debug=False, threaded=True)
@@ -2,21 +2,32 @@
 AI GENERATED TESTS
 Test Type: Integration + Unit tests
 Validation: All 5 API endpoints + core business logic
-Command: cd /path/to/blackrock-api && python -m pytest tests/ -v
-Dependencies: flask (stdlib test client — no extra install needed)
+Command: cd /path/to/blackrock-api && python -m pytest tests/ -v  (add -n auto to parallelize)
+Dependencies: flask, pytest (see requirements-dev.txt)
 """
-import sys, os, unittest, json, math
+import sys, os, unittest, json, math, logging
+from datetime import datetime
+import pytest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from main import app as flask_app
+from main import app as flask_app, health
 from business import (
     compute_ceiling, compute_remanent, parse_dt,
     calculate_tax, calculate_tax_benefit,
-    apply_q_periods, apply_p_periods,
+    apply_q_periods, apply_p_periods, apply_q_periods_parsed, apply_p_periods_parsed,
+    order_q_periods,
     calculate_nps_return, calculate_index_return,
-    compute_years, validate_transactions,
+    calculate_nps_returns, calculate_index_returns,
+    compute_years, validate_transactions, compute_remanents, parse_periods,
+    merge_periods, in_any_period, group_by_k, process_transactions,
+    round_up_amounts, real_growth_factor, compound_value, inflation_adjust,
 )
 
+# Propagate view exceptions to the test instead of rendering a 500 page; no request logging.
+# (Compact, unsorted JSON output is already configured on the app itself.)
+flask_app.testing = True
+logging.getLogger("werkzeug").disabled = True
+
 
 EXAMPLE_TRANSACTIONS = [
     {"date": "2023-10-12 20:15:30", "amount": 250},
@@ -24,6 +35,8 @@ EXAMPLE_TRANSACTIONS = [
     {"date": "2023-07-01 21:59:00", "amount": 620},
     {"date": "2023-12-17 08:09:45", "amount": 480},
 ]
+# amount -> expected remanent for EXAMPLE_TRANSACTIONS
+EXPECTED_REMANENTS = {250: 50, 375: 25, 620: 80, 480: 20}
 
 RETURNS_PAYLOAD = {
     "age": 29,
@@ -43,199 +56,351 @@ RETURNS_PAYLOAD = {
         {"date": "2023-12-17 08:09:45", "amount": -10},  # duplicate date → invalid
     ],
 }
+# Serialized once; RETURNS_PAYLOAD is never mutated
+RETURNS_PAYLOAD_BYTES = json.dumps(RETURNS_PAYLOAD).encode()
+
+
+# Shared q/p period fixtures: dict form (as posted) and pre-parsed form
+_Q_JUL = [{"fixed": 0, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}]
+_Q_JUL_PARSED = parse_periods(_Q_JUL, "fixed")
+_P_Q4 = [{"extra": 25, "start": "2023-10-01 08:00:00", "end": "2023-12-31 19:59:59"}]
+_P_Q4_PARSED = parse_periods(_P_Q4, "extra")
+_DT_FEB28 = datetime(2023, 2, 28)
+_DT_JUL15 = datetime(2023, 7, 15)
+_DT_AUG5 = datetime(2023, 8, 5)
+_DT_OCT12 = datetime(2023, 10, 12)
 
 
 def post(client, url, payload):
-    return client.post(url, data=json.dumps(payload), content_type="application/json")
+    return client.post(url, json=payload)
+
+
+def post_raw(client, url, body_bytes):
+    return client.post(url, data=body_bytes, content_type="application/json")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # UNIT TESTS: Business Logic
 # ─────────────────────────────────────────────────────────────────────────────
 
-class TestCeilingAndRemanent(unittest.TestCase):
-    """Unit: ceiling/remanent calculations"""
+# Unit: ceiling/remanent calculations
+@pytest.mark.parametrize("amount,exp_ceil,exp_rem", [
+    (250, 300, 50), (375, 400, 25), (620, 700, 80), (480, 500, 20),  # problem examples
+    (1519, 1600, 81),  # large amount
+    (400, 400, 0),     # exact multiple → zero remanent
+    (0, 0, 0),         # zero amount
+])
+def test_ceiling_and_remanent(amount, exp_ceil, exp_rem):
+    ceiling = compute_ceiling(amount)
+    assert ceiling == exp_ceil
+    assert compute_remanent(amount, ceiling) == exp_rem
 
-    def test_basic_examples_from_problem(self):
-        cases = [(250, 300, 50), (375, 400, 25), (620, 700, 80), (480, 500, 20)]
-        for amount, exp_ceil, exp_rem in cases:
-            with self.subTest(amount=amount):
-                c = compute_ceiling(amount)
-                self.assertEqual(c, exp_ceil)
-                self.assertEqual(compute_remanent(amount, c), exp_rem)
 
-    def test_large_amount(self):
-        self.assertEqual(compute_ceiling(1519), 1600)
-        self.assertEqual(compute_remanent(1519, 1600), 81)
+def test_ceiling_batch_matches_scalar():
+    ceilings, remanents = round_up_amounts([250, 375, 400, 0])
+    assert ceilings == [300, 400, 400, 0]
+    assert remanents == [50, 25, 0, 0]
 
-    def test_exact_multiple_zero_remanent(self):
-        self.assertEqual(compute_ceiling(400), 400)
-        self.assertEqual(compute_remanent(400, 400), 0)
 
-    def test_zero_amount(self):
-        self.assertEqual(compute_ceiling(0), 0)
+# Unit: datetime parsing (fast path + strptime fallback)
+def test_canonical_format():
+    assert parse_dt("2023-10-12 20:15:30") == datetime(2023, 10, 12, 20, 15, 30)
 
 
-class TestTaxSlabs(unittest.TestCase):
-    """Unit: Indian simplified tax slabs"""
+def test_minutes_only_format():
+    assert parse_dt(" 2023-10-12 20:15 ") == datetime(2023, 10, 12, 20, 15)
 
-    def test_zero_below_7l(self):
-        self.assertEqual(calculate_tax(600_000), 0)
-        self.assertEqual(calculate_tax(700_000), 0)
 
-    def test_10pct_slab(self):
-        self.assertEqual(calculate_tax(800_000), 10_000)
+def test_out_of_range_rejected():
+    with pytest.raises(ValueError):
+        parse_dt("2023-13-01 00:00:00")
 
-    def test_15pct_slab(self):
-        self.assertEqual(calculate_tax(1_100_000), 45_000)
 
-    def test_20pct_slab(self):
-        self.assertEqual(calculate_tax(1_300_000), 80_000)
+def test_garbage_rejected():
+    with pytest.raises(ValueError):
+        parse_dt("not-a-date")
 
-    def test_30pct_slab(self):
-        self.assertEqual(calculate_tax(1_600_000), 150_000)
 
-    def test_tax_benefit_zero_for_low_income(self):
-        # Annual income = 600000 (under 7L) → no tax, no benefit
-        benefit = calculate_tax_benefit(145, 600_000)
-        self.assertEqual(benefit, 0.0)
-
-    def test_tax_benefit_high_income(self):
-        # Annual income = 1200000, invested = 150000 → should get benefit
-        benefit = calculate_tax_benefit(150_000, 1_200_000)
-        self.assertGreater(benefit, 0)
-
-
-class TestQPeriodRules(unittest.TestCase):
-    """Unit: q period fixed amount override"""
-
-    def test_overrides_remanent(self):
-        from datetime import datetime
-        dt = datetime(2023, 7, 15)
-        q = [{"fixed": 0, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}]
-        self.assertEqual(apply_q_periods(80, dt, q), 0)
-
-    def test_no_match_returns_original(self):
-        from datetime import datetime
-        dt = datetime(2023, 8, 5)
-        q = [{"fixed": 0, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}]
-        self.assertEqual(apply_q_periods(80, dt, q), 80)
-
-    def test_latest_start_wins(self):
-        from datetime import datetime
-        dt = datetime(2023, 7, 20)
-        q = [
-            {"fixed": 10, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"},
-            {"fixed": 99, "start": "2023-07-15 00:00:00", "end": "2023-07-31 23:59:59"},
-        ]
-        self.assertEqual(apply_q_periods(80, dt, q), 99)
-
-    def test_same_start_first_in_list_wins(self):
-        from datetime import datetime
-        dt = datetime(2023, 7, 20)
-        q = [
-            {"fixed": 5,  "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"},
-            {"fixed": 15, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"},
-        ]
-        self.assertEqual(apply_q_periods(80, dt, q), 5)
-
-    def test_inclusive_boundary(self):
-        from datetime import datetime
-        # Exactly on start date
-        dt = datetime(2023, 7, 1, 0, 0, 0)
-        q = [{"fixed": 42, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}]
-        self.assertEqual(apply_q_periods(80, dt, q), 42)
-
-
-class TestPPeriodRules(unittest.TestCase):
-    """Unit: p period extra amount addition"""
-
-    def test_adds_single_extra(self):
-        from datetime import datetime
-        dt = datetime(2023, 10, 12)
-        p = [{"extra": 25, "start": "2023-10-01 08:00:00", "end": "2023-12-31 19:59:59"}]
-        self.assertEqual(apply_p_periods(50, dt, p), 75)
-
-    def test_adds_multiple_extras(self):
-        from datetime import datetime
-        dt = datetime(2023, 10, 15)
-        p = [
-            {"extra": 25, "start": "2023-10-01 00:00:00", "end": "2023-12-31 23:59:59"},
-            {"extra": 10, "start": "2023-10-01 00:00:00", "end": "2023-12-31 23:59:59"},
-        ]
-        self.assertEqual(apply_p_periods(50, dt, p), 85)
-
-    def test_outside_range_no_change(self):
-        from datetime import datetime
-        dt = datetime(2023, 2, 28)
-        p = [{"extra": 25, "start": "2023-10-01 08:00:00", "end": "2023-12-31 19:59:59"}]
-        self.assertEqual(apply_p_periods(25, dt, p), 25)
-
-    def test_q_then_p_both_apply(self):
-        """q overrides to fixed, then p adds extra on top"""
-        from datetime import datetime
-        # Simulate a transaction that hits both q (→0) and p (+25)
-        dt = datetime(2023, 7, 1)  # in q period AND in p period (hypothetical overlap)
-        q = [{"fixed": 0, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}]
-        p = [{"extra": 25, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}]
-        rem = apply_q_periods(80, dt, q)   # → 0
-        rem = apply_p_periods(rem, dt, p)  # 0 + 25 → 25
-        self.assertEqual(rem, 25)
-
-
-class TestInvestmentReturns(unittest.TestCase):
-    """Unit: compound interest and inflation adjustment"""
-
-    def test_years_normal(self):
-        self.assertEqual(compute_years(29), 31)
-
-    def test_years_minimum_enforced(self):
-        self.assertEqual(compute_years(60), 5)
-        self.assertEqual(compute_years(70), 5)
-
-    def test_nps_profit_matches_example(self):
-        profit, tax_benefit = calculate_nps_return(145, 29, 50_000, 5.5)
-        self.assertAlmostEqual(profit, 86.88, delta=1.0)
-        self.assertEqual(tax_benefit, 0.0)
-
-    def test_index_return_matches_example(self):
-        ret = calculate_index_return(145, 29, 5.5)
-        self.assertAlmostEqual(ret, 1829.5, delta=5.0)
-
-    def test_zero_amount_returns_zero_profit(self):
-        profit, _ = calculate_nps_return(0, 29, 50_000, 5.5)
-        self.assertEqual(profit, 0.0)
-
-
-class TestValidation(unittest.TestCase):
-    """Unit: transaction validation rules"""
-
-    def test_negative_amount(self):
-        valid, invalid = validate_transactions([
-            {"date": "2023-01-01 10:00:00", "amount": -100}
-        ])
-        self.assertEqual(len(valid), 0)
-        self.assertEqual(len(invalid), 1)
-        self.assertIn("Negative", invalid[0]["message"])
-
-    def test_duplicate_date(self):
-        txs = [
-            {"date": "2023-01-01 10:00:00", "amount": 250},
-            {"date": "2023-01-01 10:00:00", "amount": 250},
-        ]
-        valid, invalid = validate_transactions(txs)
-        self.assertEqual(len(valid), 1)
-        self.assertEqual(len(invalid), 1)
-        self.assertIn("Duplicate", invalid[0]["message"])
-
-    def test_valid_passes_through(self):
-        txs = [
-            {"date": "2023-01-01 10:00:00", "amount": 250},
-            {"date": "2023-06-15 14:30:00", "amount": 480},
-        ]
-        valid, invalid = validate_transactions(txs)
-        self.assertEqual(len(valid), 2)
-        self.assertEqual(len(invalid), 0)
+def test_iso_t_separator_rejected():
+    with pytest.raises(ValueError):
+        parse_dt("2023-10-12T20:15:30")
+
+
+# Unit: Indian simplified tax slabs
+@pytest.mark.parametrize("income,expected_tax", [
+    (600_000, 0), (700_000, 0),  # zero below 7L
+    (800_000, 10_000),           # 10% slab
+    (1_100_000, 45_000),         # 15% slab
+    (1_300_000, 80_000),         # 20% slab
+    (1_600_000, 150_000),        # 30% slab
+])
+def test_tax_slab(income, expected_tax):
+    assert calculate_tax(income) == expected_tax
+
+
+def test_tax_benefit_zero_for_low_income():
+    # Annual income = 600000 (under 7L) → no tax, no benefit
+    assert calculate_tax_benefit(145, 600_000) == 0.0
+
+
+def test_tax_benefit_high_income():
+    # Annual income = 1200000, invested = 150000 → should get benefit
+    assert calculate_tax_benefit(150_000, 1_200_000) > 0
+
+
+# Unit: q period fixed amount override
+def test_overrides_remanent():
+    assert apply_q_periods_parsed(80, _DT_JUL15, _Q_JUL_PARSED) == 0
+
+
+def test_no_match_returns_original():
+    assert apply_q_periods_parsed(80, _DT_AUG5, _Q_JUL_PARSED) == 80
+
+
+def test_q_dict_periods_match_parsed():
+    assert apply_q_periods(80, _DT_JUL15, _Q_JUL) == 0
+
+
+def test_latest_start_wins():
+    dt = datetime(2023, 7, 20)
+    q = [
+        {"fixed": 10, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"},
+        {"fixed": 99, "start": "2023-07-15 00:00:00", "end": "2023-07-31 23:59:59"},
+    ]
+    assert apply_q_periods_parsed(80, dt, order_q_periods(parse_periods(q, "fixed"))) == 99
+
+
+def test_same_start_first_in_list_wins():
+    dt = datetime(2023, 7, 20)
+    q = [
+        {"fixed": 5,  "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"},
+        {"fixed": 15, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"},
+    ]
+    assert apply_q_periods_parsed(80, dt, order_q_periods(parse_periods(q, "fixed"))) == 5
+
+
+def test_inclusive_boundary():
+    # Exactly on start date
+    dt = datetime(2023, 7, 1, 0, 0, 0)
+    q = [{"fixed": 42, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}]
+    assert apply_q_periods_parsed(80, dt, order_q_periods(parse_periods(q, "fixed"))) == 42
+
+
+# Unit: p period extra amount addition
+def test_adds_single_extra():
+    assert apply_p_periods_parsed(50, _DT_OCT12, _P_Q4_PARSED) == 75
+
+
+def test_adds_multiple_extras():
+    dt = datetime(2023, 10, 15)
+    p = [
+        {"extra": 25, "start": "2023-10-01 00:00:00", "end": "2023-12-31 23:59:59"},
+        {"extra": 10, "start": "2023-10-01 00:00:00", "end": "2023-12-31 23:59:59"},
+    ]
+    assert apply_p_periods_parsed(50, dt, parse_periods(p, "extra")) == 85
+
+
+def test_outside_range_no_change():
+    assert apply_p_periods_parsed(25, _DT_FEB28, _P_Q4_PARSED) == 25
+
+
+def test_p_dict_periods_match_parsed():
+    assert apply_p_periods(50, _DT_OCT12, _P_Q4) == 75
+
+
+def test_q_then_p_both_apply():
+    """q overrides to fixed, then p adds extra on top"""
+    # Simulate a transaction that hits both q (→0) and p (+25)
+    dt = datetime(2023, 7, 1)  # in q period AND in p period (hypothetical overlap)
+    q = [{"fixed": 0, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}]
+    p = [{"extra": 25, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}]
+    rem = apply_q_periods(80, dt, q)   # → 0
+    rem = apply_p_periods(rem, dt, p)  # 0 + 25 → 25
+    assert rem == 25
+
+
+def test_column_kernel_applies_q_then_p():
+    ceilings, remanents = compute_remanents(
+        [620, 250, 375], [_DT_JUL15, _DT_OCT12, _DT_FEB28], _Q_JUL_PARSED, _P_Q4_PARSED,
+    )
+    assert ceilings == [700, 300, 400]
+    assert remanents == [0, 75, 25]
+
+
+def test_column_kernel_q_precedence_matches_scalar_rule():
+    q = parse_periods([
+        {"fixed": 5,  "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"},
+        {"fixed": 99, "start": "2023-07-15 00:00:00", "end": "2023-07-20 23:59:59"},
+        {"fixed": 15, "start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"},
+    ], "fixed")
+    dts = [datetime(2023, 7, 2), datetime(2023, 7, 16), datetime(2023, 7, 25)]
+    _, remanents = compute_remanents([620, 620, 620], dts, q, [])
+    assert remanents == [5, 99, 5]
+    assert remanents == [apply_q_periods_parsed(80, dt, order_q_periods(q)) for dt in dts]
+
+
+# Unit: k period membership and grouping
+def test_membership_across_overlapping_and_disjoint_periods():
+    starts, ends = merge_periods(parse_periods([
+        {"start": "2023-03-01 00:00:00", "end": "2023-05-31 23:59:59"},
+        {"start": "2023-01-01 00:00:00", "end": "2023-03-15 00:00:00"},
+        {"start": "2023-09-01 00:00:00", "end": "2023-09-30 23:59:59"},
+    ]))
+    assert len(starts) == 2
+    assert in_any_period(datetime(2023, 1, 1), starts, ends)
+    assert in_any_period(datetime(2023, 5, 31, 23, 59, 59), starts, ends)
+    assert not in_any_period(datetime(2023, 7, 1), starts, ends)
+    assert in_any_period(datetime(2023, 9, 15), starts, ends)
+    assert not in_any_period(datetime(2022, 12, 31), starts, ends)
+
+
+def test_group_sums_overlapping_periods_independently():
+    processed = process_transactions([
+        {"date": "2023-12-17 08:09:45", "amount": 480},
+        {"date": "2023-02-28 15:49:20", "amount": 375},
+        {"date": "2023-10-12 20:15:30", "amount": 250},
+    ], [], [])
+    groups = group_by_k(processed, parse_periods([
+        {"start": "2023-01-01 00:00:00", "end": "2023-12-31 23:59:59"},
+        {"start": "2023-03-01 00:00:00", "end": "2023-11-30 23:59:59"},
+        {"start": "2024-01-01 00:00:00", "end": "2024-12-31 23:59:59"},
+    ]))
+    assert [g["amount"] for g in groups] == [95.0, 50.0, 0.0]
+
+
+def test_group_reversed_period_sums_to_zero():
+    processed = process_transactions([
+        {"date": "2023-02-28 15:49:20", "amount": 375},
+        {"date": "2023-10-12 20:15:30", "amount": 250},
+        {"date": "2023-12-17 08:09:45", "amount": 480},
+    ], [], [])
+    groups = group_by_k(processed, parse_periods([
+        {"start": "2023-11-01 00:00:00", "end": "2023-03-01 00:00:00"},
+    ]))
+    assert groups[0]["amount"] == 0.0
+
+
+def test_group_non_finite_remanents_fall_back_to_float_sum():
+    processed = process_transactions([
+        {"date": "2023-02-28 15:49:20", "amount": 375},
+        {"date": "2023-10-12 20:15:30", "amount": 250},
+    ], [], parse_periods([
+        {"extra": 1e307, "start": "2023-10-01 00:00:00", "end": "2023-10-31 23:59:59"},
+    ], "extra"))
+    groups = group_by_k(processed, parse_periods([
+        {"start": "2023-01-01 00:00:00", "end": "2023-03-31 23:59:59"},
+        {"start": "2023-01-01 00:00:00", "end": "2023-12-31 23:59:59"},
+    ]))
+    assert [g["amount"] for g in groups] == [25.0, 1e307]
+
+
+# Unit: compound interest and inflation adjustment
+def test_years_normal():
+    assert compute_years(29) == 31
+
+
+def test_years_minimum_enforced():
+    assert compute_years(60) == 5
+    assert compute_years(70) == 5
+
+
+def test_nps_profit_matches_example():
+    profit, tax_benefit = calculate_nps_return(145, 29, 50_000, 5.5)
+    assert profit == pytest.approx(86.88, abs=1.0)
+    assert tax_benefit == 0.0
+
+
+def test_index_return_matches_example():
+    ret = calculate_index_return(145, 29, 5.5)
+    assert ret == pytest.approx(1829.5, abs=5.0)
+
+
+def test_growth_factor_matches_two_step():
+    two_step = inflation_adjust(compound_value(145, 0.0711, 31), 5.5, 31)
+    assert 145 * real_growth_factor(0.0711, 5.5, 31) == pytest.approx(two_step, abs=1e-6)
+
+
+def test_returns_batch_matches_scalar():
+    amounts = [145, 75, 250_000]
+    assert (
+        calculate_nps_returns(amounts, 29, 150_000, 5.5)
+        == [calculate_nps_return(a, 29, 150_000, 5.5) for a in amounts]
+    )
+    assert (
+        calculate_index_returns(amounts, 29, 5.5)
+        == [calculate_index_return(a, 29, 5.5) for a in amounts]
+    )
+
+
+def test_nps_tax_benefit_matches_slab_calc():
+    _, tax_benefit = calculate_nps_return(150_000, 29, 100_000, 5.5)
+    assert tax_benefit == round(calculate_tax_benefit(150_000, 1_200_000), 2)
+
+
+def test_returns_are_closed_form_lump_sum():
+    # One deposit compounded for t years: P * ((1 + r) / (1 + i))^t, no per-year loop
+    assert calculate_index_return(145, 29, 5.5) == round(145 * (1.1449 / 1.055) ** 31, 2)
+    profit, _ = calculate_nps_return(145, 29, 50_000, 5.5)
+    assert profit == round(145 * (1.0711 / 1.055) ** 31 - 145, 2)
+
+
+def test_zero_amount_returns_zero_profit():
+    profit, _ = calculate_nps_return(0, 29, 50_000, 5.5)
+    assert profit == 0.0
+
+
+# Unit: transaction validation rules
+def test_negative_amount():
+    valid, invalid = validate_transactions([
+        {"date": "2023-01-01 10:00:00", "amount": -100}
+    ])
+    assert len(valid) == 0
+    assert len(invalid) == 1
+    _, message = invalid[0]
+    assert "Negative" in message
+
+
+def test_duplicate_date():
+    txs = [
+        {"date": "2023-01-01 10:00:00", "amount": 250},
+        {"date": "2023-01-01 10:00:00", "amount": 250},
+    ]
+    valid, invalid = validate_transactions(txs)
+    assert len(valid) == 1
+    assert len(invalid) == 1
+    _, message = invalid[0]
+    assert "Duplicate" in message
+
+
+def test_valid_passes_through():
+    txs = [
+        {"date": "2023-01-01 10:00:00", "amount": 250},
+        {"date": "2023-06-15 14:30:00", "amount": 480},
+    ]
+    valid, invalid = validate_transactions(txs)
+    assert len(valid) == 2
+    assert len(invalid) == 0
+
+
+def test_negative_does_not_reserve_date():
+    txs = [
+        {"date": "2023-01-01 10:00:00", "amount": -100},
+        {"date": "2023-01-01 10:00:00", "amount": 250},
+    ]
+    valid, invalid = validate_transactions(txs)
+    assert valid == [txs[1]]
+    assert invalid == [(txs[0], "Negative amounts are not allowed")]
+
+
+def test_large_batch_keeps_first_of_each_date():
+    # 20k rows over 1k distinct timestamps: one hash lookup per row
+    txs = [
+        {"date": f"2023-01-01 {d // 60:02d}:{d % 60:02d}:00", "amount": 100}
+        for d in (i % 1000 for i in range(20_000))
+    ]
+    valid, invalid = validate_transactions(txs)
+    assert valid == txs[:1000]
+    assert len(invalid) == 19_000
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -245,32 +410,35 @@ class TestValidation(unittest.TestCase):
 class TestParseEndpoint(unittest.TestCase):
     """Integration: POST /transactions:parse"""
 
-    def setUp(self):
-        self.client = flask_app.test_client()
+    @classmethod
+    def setUpClass(cls):
+        cls.client = flask_app.test_client()
+        cls.example_resp = post(cls.client, "/blackrock/challenge/v1/transactions:parse", EXAMPLE_TRANSACTIONS)
+        cls.example_data = cls.example_resp.get_json()
 
     def test_problem_example(self):
-        resp = post(self.client, "/blackrock/challenge/v1/transactions:parse", EXAMPLE_TRANSACTIONS)
-        self.assertEqual(resp.status_code, 200)
-        data = resp.get_json()
-        self.assertEqual(len(data), 4)
-        # Verify each remanent
-        by_amount = {d["amount"]: d for d in data}
-        self.assertEqual(by_amount[250]["remanent"], 50)
-        self.assertEqual(by_amount[375]["remanent"], 25)
-        self.assertEqual(by_amount[620]["remanent"], 80)
-        self.assertEqual(by_amount[480]["remanent"], 20)
+        self.assertEqual(self.example_resp.status_code, 200)
+        self.assertEqual(len(self.example_data), 4)
+        self.assertEqual({d["amount"]: d["remanent"] for d in self.example_data}, EXPECTED_REMANENTS)
 
     def test_empty_list(self):
         resp = post(self.client, "/blackrock/challenge/v1/transactions:parse", [])
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.get_json(), [])
 
+    def test_malformed_json_rejected(self):
+        resp = self.client.post(
+            "/blackrock/challenge/v1/transactions:parse", data=b"[{bad", content_type="application/json",
+        )
+        self.assertEqual(resp.status_code, 400)
+
 
 class TestValidatorEndpoint(unittest.TestCase):
     """Integration: POST /transactions:validator"""
 
-    def setUp(self):
-        self.client = flask_app.test_client()
+    @classmethod
+    def setUpClass(cls):
+        cls.client = flask_app.test_client()
 
     def test_catches_negative(self):
         payload = {
@@ -301,8 +469,9 @@ class TestValidatorEndpoint(unittest.TestCase):
 class TestFilterEndpoint(unittest.TestCase):
     """Integration: POST /transactions:filter"""
 
-    def setUp(self):
-        self.client = flask_app.test_client()
+    @classmethod
+    def setUpClass(cls):
+        cls.client = flask_app.test_client()
 
     def test_q_period_zeroes_remanent(self):
         payload = {
@@ -340,65 +509,74 @@ class TestFilterEndpoint(unittest.TestCase):
         self.assertEqual(len(data["valid"]), 1)
         self.assertEqual(len(data["invalid"]), 2)
 
+    def test_malformed_period_rejected(self):
+        bad_periods = {
+            "q": [{"start": "2023-07-01 00:00:00", "end": "2023-07-31 23:59:59"}],  # no fixed
+            "p": [{"start": "2023-10-01 00:00:00", "end": "2023-12-31 23:59:59"}],  # no extra
+            "k": [{"start": "2023-13-01 00:00:00", "end": "2023-12-31 23:59:59"}],  # bad date
+        }
+        for key, periods in bad_periods.items():
+            with self.subTest(key=key):
+                payload = {"q": [], "p": [], "k": [], "wage": 50000, "transactions": []}
+                payload[key] = periods
+                resp = post(self.client, "/blackrock/challenge/v1/transactions:filter", payload)
+                self.assertEqual(resp.status_code, 400)
+                self.assertIn(f"'{key}' period", resp.get_json()["message"])
+
 
 class TestNPSReturnsEndpoint(unittest.TestCase):
-    """Integration: POST /returns:nps"""
+    """Integration: POST /returns:nps (one request shared by every test)"""
 
-    def setUp(self):
-        self.client = flask_app.test_client()
+    @classmethod
+    def setUpClass(cls):
+        cls.client = flask_app.test_client()
+        cls.data = post_raw(cls.client, "/blackrock/challenge/v1/returns:nps", RETURNS_PAYLOAD_BYTES).get_json()
+        cls.by_start = {s["start"]: s for s in cls.data["savingsByDates"]}
 
     def test_full_year_amount_145(self):
-        data = post(self.client, "/blackrock/challenge/v1/returns:nps", RETURNS_PAYLOAD).get_json()
-        full_year = next(s for s in data["savingsByDates"] if s["start"] == "2023-01-01 00:00:00")
-        self.assertEqual(full_year["amount"], 145.0)
+        self.assertEqual(self.by_start["2023-01-01 00:00:00"]["amount"], 145.0)
 
     def test_profit_approx_86(self):
-        data = post(self.client, "/blackrock/challenge/v1/returns:nps", RETURNS_PAYLOAD).get_json()
-        full_year = next(s for s in data["savingsByDates"] if s["start"] == "2023-01-01 00:00:00")
-        self.assertAlmostEqual(full_year["profit"], 86.88, delta=1.0)
+        self.assertAlmostEqual(self.by_start["2023-01-01 00:00:00"]["profit"], 86.88, delta=1.0)
 
     def test_tax_benefit_zero_for_low_income(self):
-        data = post(self.client, "/blackrock/challenge/v1/returns:nps", RETURNS_PAYLOAD).get_json()
-        full_year = next(s for s in data["savingsByDates"] if s["start"] == "2023-01-01 00:00:00")
-        self.assertEqual(full_year["taxBenefit"], 0.0)
+        self.assertEqual(self.by_start["2023-01-01 00:00:00"]["taxBenefit"], 0.0)
 
     def test_march_to_nov_amount_75(self):
-        data = post(self.client, "/blackrock/challenge/v1/returns:nps", RETURNS_PAYLOAD).get_json()
-        partial = next(s for s in data["savingsByDates"] if s["start"] == "2023-03-01 00:00:00")
-        self.assertEqual(partial["amount"], 75.0)
+        self.assertEqual(self.by_start["2023-03-01 00:00:00"]["amount"], 75.0)
 
     def test_total_transaction_amount(self):
-        data = post(self.client, "/blackrock/challenge/v1/returns:nps", RETURNS_PAYLOAD).get_json()
         # Valid: 375, 620, 250, 480 = 1725 (-10 is invalid due to duplicate date with 480)
-        self.assertEqual(data["totalTransactionAmount"], 1725.0)
+        self.assertEqual(self.data["totalTransactionAmount"], 1725.0)
 
 
 class TestIndexReturnsEndpoint(unittest.TestCase):
-    """Integration: POST /returns:index"""
+    """Integration: POST /returns:index (compared against one /returns:nps request)"""
 
-    def setUp(self):
-        self.client = flask_app.test_client()
+    @classmethod
+    def setUpClass(cls):
+        cls.client = flask_app.test_client()
+        cls.data = post_raw(cls.client, "/blackrock/challenge/v1/returns:index", RETURNS_PAYLOAD_BYTES).get_json()
+        cls.nps_data = post_raw(cls.client, "/blackrock/challenge/v1/returns:nps", RETURNS_PAYLOAD_BYTES).get_json()
 
     def test_no_tax_benefit(self):
-        data = post(self.client, "/blackrock/challenge/v1/returns:index", RETURNS_PAYLOAD).get_json()
-        for s in data["savingsByDates"]:
+        for s in self.data["savingsByDates"]:
             self.assertEqual(s["taxBenefit"], 0.0)
 
     def test_higher_profit_than_nps(self):
-        nps_data = post(self.client, "/blackrock/challenge/v1/returns:nps", RETURNS_PAYLOAD).get_json()
-        idx_data = post(self.client, "/blackrock/challenge/v1/returns:index", RETURNS_PAYLOAD).get_json()
-        nps_profit = nps_data["savingsByDates"][0]["profit"]
-        idx_profit = idx_data["savingsByDates"][0]["profit"]
+        nps_profit = self.nps_data["savingsByDates"][0]["profit"]
+        idx_profit = self.data["savingsByDates"][0]["profit"]
         self.assertGreater(idx_profit, nps_profit)  # 14.49% > 7.11%
 
 
-class TestPerformanceEndpoint(unittest.TestCase):
-    """Integration: GET /performance"""
+class TestSmokeEndpoints(unittest.TestCase):
+    """Integration: GET /performance and GET /health"""
 
-    def setUp(self):
-        self.client = flask_app.test_client()
+    @classmethod
+    def setUpClass(cls):
+        cls.client = flask_app.test_client()
 
-    def test_fields_present(self):
+    def test_performance_fields_present(self):
         resp = self.client.get("/blackrock/challenge/v1/performance")
         self.assertEqual(resp.status_code, 200)
         data = resp.get_json()
@@ -408,18 +586,14 @@ class TestPerformanceEndpoint(unittest.TestCase):
         self.assertIsInstance(data["threads"], int)
         self.assertIn("MB", data["memory"])
 
-
-class TestHealthEndpoint(unittest.TestCase):
-    """Integration: GET /health"""
-
-    def setUp(self):
-        self.client = flask_app.test_client()
-
     def test_health_ok(self):
-        resp = self.client.get("/health")
-        self.assertEqual(resp.status_code, 200)
+        # Call the view in a request context directly; only the route lookup is checked separately
+        self.assertEqual(flask_app.url_map.bind("localhost").match("/health", method="GET"), ("health", {}))
+        with flask_app.test_request_context("/health"):
+            resp, status = health()
+        self.assertEqual(status, 200)
         self.assertEqual(resp.get_json()["status"], "ok")
 
 
 if __name__ == "__main__":
-    unittest.main(verbosity=2)
+    sys.exit(pytest.main([__file__, "-v"]))